@@ -5,21 +5,41 @@ Tables are embedded to keep the app portable.
 """
 from __future__ import annotations
 
+import heapq
 import json
 import math
 import os
 import random
-import tkinter as tk
-import urllib.request
-from dataclasses import dataclass
-from tkinter import ttk
-from typing import Dict, List, Optional, Tuple
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    import tkinter as tk
+    from tkinter import ttk
 
 # ------------------------- dice utilities -------------------------
 
+# Bound once: int(_random() * n) is much cheaper than random.randint/choice on the hot path.
+_random = random.random
+
 
 def roll_dice(num: int, die: int, multiplier: int = 1) -> int:
-    return sum(random.randint(1, die) for _ in range(num)) * multiplier
+    total = num
+    for _ in range(num):
+        total += int(_random() * die)
+    return total * multiplier
+
+
+def roll_dice_batch(num: int, die: int, multiplier: int, k: int) -> List[int]:
+    """Roll the same dice ``k`` times, drawing every face in one pass."""
+    if num <= 0:
+        return [0] * k
+    faces = [int(_random() * die) for _ in range(num * k)]
+    return [(num + sum(faces[i:i + num])) * multiplier for i in range(0, num * k, num)]
 
 
 def parse_dice(expr: str) -> Tuple[int, int, int]:
@@ -34,13 +54,74 @@ def parse_dice(expr: str) -> Tuple[int, int, int]:
     return num, int(parts[1]), 1
 
 
+_DICE_CACHE: Dict[str, Tuple[int, int, int]] = {}
+
+
+def compile_dice(expr: str) -> Tuple[int, int, int]:
+    """Memoized ``parse_dice``; the tables reuse a handful of expressions."""
+    parsed = _DICE_CACHE.get(expr)
+    if parsed is None:
+        parsed = _DICE_CACHE[expr] = parse_dice(expr)
+    return parsed
+
+
 def roll_expr(expr: str) -> int:
-    num, die, mult = parse_dice(expr)
+    num, die, mult = compile_dice(expr)
     return roll_dice(num, die, mult)
 
 
+def roll_expr_batch(expr: str, k: int) -> List[int]:
+    num, die, mult = compile_dice(expr)
+    return roll_dice_batch(num, die, mult, k)
+
+
+# ------------------------- table sampling -------------------------
+
+
+class D100Table:
+    """Lookup table over d100 ``(threshold, item)`` rows.
+
+    ``lut[roll - 1]`` holds whatever a linear "first threshold >= roll" scan would pick,
+    so sampling is one draw and one index.  Rolls above the last threshold yield
+    ``fallback``.
+    """
+
+    __slots__ = ("lut",)
+
+    def __init__(self, rows: Sequence[Tuple[int, Any]], fallback: Any = None):
+        lut: List[Any] = []
+        for threshold, item in rows:
+            width = min(threshold, 100) - len(lut)
+            if width > 0:
+                lut.extend([item] * width)
+        lut.extend([fallback] * (100 - len(lut)))
+        self.lut = lut
+
+    def sample(self) -> Any:
+        return self.lut[int(_random() * 100)]
+
+
+def _cr_band_bounds(bands: Sequence[Tuple[Tuple[float, float], Any]]) -> Tuple[array, array]:
+    return array("d", [rng[0] for rng, _ in bands]), array("d", [rng[1] for rng, _ in bands])
+
+
+def _band_index(bounds: Tuple[array, array], cr: float) -> int:
+    """Bisect for the sorted, disjoint CR band holding ``cr``; the last band if none does."""
+    lows, highs = bounds
+    idx = bisect_right(lows, cr) - 1
+    if idx >= 0 and cr <= highs[idx]:
+        return idx
+    return len(lows) - 1
+
+
 # ------------------------- treasure tables -------------------------
 
+COIN_DENOMS = ("cp", "sp", "ep", "gp", "pp")
+# Rolled coins as amounts in COIN_DENOMS order; 0 means none of that denomination
+Coins = Tuple[int, int, int, int, int]
+NO_COINS: Coins = (0, 0, 0, 0, 0)
+
+
 @dataclass
 class CoinEntry:
     cp: str = "0"
@@ -48,20 +129,33 @@ class CoinEntry:
     ep: str = "0"
     gp: str = "0"
     pp: str = "0"
+    # Flat (num, die, multiplier) per denomination in COIN_DENOMS order; num == 0 means no coins
+    dice: array = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        dice = array("i", [0] * (3 * len(COIN_DENOMS)))
+        for slot, denom in enumerate(COIN_DENOMS):
+            expr = getattr(self, denom)
+            if expr and expr != "0":
+                dice[3 * slot:3 * slot + 3] = array("i", compile_dice(expr))
+        self.dice = dice
+
 
+def coin_from_entry(entry: CoinEntry) -> Coins:
+    dice = entry.dice
+    return tuple(  # type: ignore[return-value]
+        roll_dice(dice[i], dice[i + 1], dice[i + 2]) if dice[i] else 0 for i in range(0, len(dice), 3)
+    )
 
-def coin_from_entry(entry: CoinEntry) -> Dict[str, int]:
-    coins: Dict[str, int] = {}
-    for denom, expr in [
-        ("cp", entry.cp),
-        ("sp", entry.sp),
-        ("ep", entry.ep),
-        ("gp", entry.gp),
-        ("pp", entry.pp),
-    ]:
-        if expr and expr != "0":
-            coins[denom] = roll_expr(expr)
-    return coins
+
+def coin_from_entry_batch(entry: CoinEntry, k: int) -> List[Coins]:
+    """Roll ``entry`` ``k`` times, batching each denomination's dice."""
+    dice = entry.dice
+    columns = [
+        roll_dice_batch(dice[i], dice[i + 1], dice[i + 2], k) if dice[i] else [0] * k
+        for i in range(0, len(dice), 3)
+    ]
+    return list(zip(*columns))
 
 
 # Individual treasure (DMG/SRD random treasure tables)
@@ -97,6 +191,9 @@ INDIVIDUAL_TABLES: List[Tuple[Tuple[float, float], List[Tuple[int, int, CoinEntr
     ]),
 ]
 
+INDIVIDUAL_LUT: List[D100Table] = [D100Table(entries) for _, entries in INDIVIDUAL_TABLES]
+_INDIVIDUAL_BOUNDS = _cr_band_bounds(INDIVIDUAL_TABLES)
+
 # Gems and art packages referenced by hoards
 GEM_PACKAGES: Dict[str, Tuple[str, str]] = {
     "10 gp": ("2d6", "10 gp gems"),
@@ -112,13 +209,15 @@ ART_PACKAGES: Dict[str, Tuple[str, str]] = {
     "750 gp": ("2d4", "750 gp art objects"),
 }
 
+MAGIC_TABLES_FILE = "magic_tables.json"
+
+
 # Condensed magic item tables (SRD items only).
 def _load_magic_tables() -> Dict[str, List[Tuple[int, int, str]]]:
     """Load dungeonmastertools magic tables if available; otherwise use the condensed SRD set."""
-    import json
-
     try:
-        raw = json.loads(open("magic_tables.json", "r", encoding="utf-8").read())
+        with open(MAGIC_TABLES_FILE, "r", encoding="utf-8") as fh:
+            raw = json.load(fh)
         return {k: [(int(threshold), item) for threshold, item in v] for k, v in raw.items()}
     except Exception:
         return {
@@ -252,6 +351,8 @@ DEFAULT_SPELLS = {
 
 
 def _fetch_spells_from_open5e() -> Dict[int, List[str]]:
+    import urllib.request
+
     spells: Dict[int, List[str]] = {i: [] for i in range(0, 10)}
     try:
         url = "https://api.open5e.com/v1/spells/"
@@ -298,35 +399,73 @@ def _ensure_spells() -> None:
     SPELLS_BY_LEVEL = dict(DEFAULT_SPELLS)
 
 
+# Single source for scroll level parsing and labels
+_LEVEL_TOKENS = (
+    ("cantrip", 0),
+    ("1st", 1),
+    ("2nd", 2),
+    ("3rd", 3),
+    ("4th", 4),
+    ("5th", 5),
+    ("6th", 6),
+    ("7th", 7),
+    ("8th", 8),
+    ("9th", 9),
+)
+_LVL_MAP = dict(_LEVEL_TOKENS)
+_SPELL_SCROLL_RE = re.compile(
+    r"spell scroll.*?(" + "|".join(token for token, _ in _LEVEL_TOKENS) + ")", re.IGNORECASE
+)
+_SCROLL_LABELS = {lvl: f"Spell scroll (level {lvl if lvl > 0 else 'cantrip'}): " for _, lvl in _LEVEL_TOKENS}
+
+
+@lru_cache(maxsize=128)
+def _scroll_level(item: str) -> Optional[int]:
+    # Only the level is cached; the spell itself is picked fresh on every call.
+    match = _SPELL_SCROLL_RE.match(item)
+    return _LVL_MAP[match.group(1).lower()] if match else None
+
+
 def _expand_spell_scroll(item: str) -> str:
-    if not item.lower().startswith("spell scroll"):
-        return item
-    level_text = item.lower()
-    level_map = {
-        "cantrip": 0,
-        "1st": 1,
-        "2nd": 2,
-        "3rd": 3,
-        "4th": 4,
-        "5th": 5,
-        "6th": 6,
-        "7th": 7,
-        "8th": 8,
-        "9th": 9,
-    }
-    target_level = None
-    for key, val in level_map.items():
-        if key in level_text:
-            target_level = val
-            break
+    target_level = _scroll_level(item)
     if target_level is None:
         return item
     _ensure_spells()
     spells = SPELLS_BY_LEVEL.get(target_level) or DEFAULT_SPELLS.get(target_level, [])
     if not spells:
         return item
-    spell_name = random.choice(spells)
-    return f"Spell scroll (level {target_level if target_level>0 else 'cantrip'}): {spell_name}"
+    spell_name = spells[int(_random() * len(spells))]
+    return _SCROLL_LABELS[target_level] + spell_name
+
+
+# Magic item names are interned into one pool; the samplers only ever hand out pool ids.
+MAGIC_ITEM_POOL: List[str] = []
+MAGIC_ITEM_IDX: Dict[str, int] = {}
+IS_SCROLL_IDX: Set[int] = set()
+
+
+def _intern_item(name: str) -> int:
+    item_id = MAGIC_ITEM_IDX.get(name)
+    if item_id is None:
+        item_id = MAGIC_ITEM_IDX[name] = len(MAGIC_ITEM_POOL)
+        MAGIC_ITEM_POOL.append(name)
+        if _scroll_level(name) is not None:
+            IS_SCROLL_IDX.add(item_id)
+    return item_id
+
+
+NO_ITEMS_ID = _intern_item("(no items configured)")
+
+
+def _magic_lut(rows: List[Tuple[int, str]]) -> Optional[D100Table]:
+    if not rows:
+        return None
+    # Rolls past the last row fall through to the last item, as the old scan did.
+    ids = [(threshold, _intern_item(item)) for threshold, item in rows]
+    return D100Table(ids, fallback=ids[-1][1])
+
+
+MAGIC_LUT: Dict[str, D100Table] = {k: _magic_lut(v) for k, v in MAGIC_TABLES.items() if v}
 
 # Hoard entries are intentionally simplified but keep the structure of the SRD tables.
 HOARD_TABLES = {
@@ -397,117 +536,206 @@ HOARD_TABLES = {
     },
 }
 
+# A hoard row compiled to plain numbers: gem and art packages as (num, die, multiplier, desc),
+# magic as (table letter, dice) pairs whose dice are already in the parse cache.
+_Package = Tuple[int, int, int, str]
+_HoardRow = Tuple[Optional[_Package], Optional[_Package], Tuple[Tuple[str, str], ...]]
+_EMPTY_HOARD_ROW: _HoardRow = (None, None, ())
+
+
+def _compile_package(packages: Dict[str, Tuple[str, str]], key: Optional[str]) -> Optional[_Package]:
+    if not key:
+        return None
+    dice, desc = packages[key]
+    return (*compile_dice(dice), desc)
+
+
+def _compile_hoard_row(reward: Dict[str, Any]) -> _HoardRow:
+    magic = tuple(reward.get("magic", []))
+    for _, dice in magic:
+        compile_dice(dice)
+    return (
+        _compile_package(GEM_PACKAGES, reward.get("gems")),
+        _compile_package(ART_PACKAGES, reward.get("art")),
+        magic,
+    )
+
+
+HOARD_ROW_LUT: Dict[str, D100Table] = {
+    key: D100Table([(threshold, _compile_hoard_row(reward)) for threshold, reward in t["rows"]], fallback=_EMPTY_HOARD_ROW)
+    for key, t in HOARD_TABLES.items()
+}
+
+
+def _individual_index(cr: float) -> int:
+    return _band_index(_INDIVIDUAL_BOUNDS, cr)
+
 
 def pick_table_for_cr(cr: float) -> Tuple[Tuple[float, float], List[Tuple[int, int, CoinEntry]]]:
-    for rng, entries in INDIVIDUAL_TABLES:
-        low, high = rng
-        if low <= cr <= high:
-            return rng, entries
-    return INDIVIDUAL_TABLES[-1]
-
-
-def roll_table(entries: List[Tuple[int, int, CoinEntry]]) -> Dict[str, int]:
-    roll = random.randint(1, 100)
-    for threshold, coins in entries:
-        if roll <= threshold:
-            return coin_from_entry(coins)
-    return {}
+    return INDIVIDUAL_TABLES[_individual_index(cr)]
 
 
-def _extend_table_with_custom(base: List[Tuple[int, int, str]], custom: List[str]) -> List[Tuple[int, int, str]]:
+def roll_table(entries: D100Table) -> Coins:
+    coins = entries.sample()
+    return coin_from_entry(coins) if coins is not None else NO_COINS
+
+
+def _extend_table_with_custom(base: List[Tuple[int, int, str]], custom: Sequence[str]) -> List[Tuple[int, int, str]]:
+    """Spread ``custom`` items over the thresholds after ``base`` (which must be sorted)."""
     if not custom:
         return base
-    table = list(base)
-    start = table[-1][0] if table else 0
+    start = base[-1][0] if base else 0
     slots = len(custom)
     remaining = max(0, 100 - start)
-    if remaining == 0:
+    wrapped = remaining == 0
+    if wrapped:
         remaining = 100 // slots
         start = 0
     step = max(1, remaining // slots)
     current = start
+    added = []
     for idx, item in enumerate(custom):
         current = min(100, current + step)
         if idx == slots - 1:
             current = 100
-        table.append((current, item))
-    table.sort(key=lambda x: x[0])
-    return table
-
-
-def choose_magic(
-    table: str,
-    extra_by_table: Optional[Dict[str, List[str]]] = None,
-    global_extra: Optional[List[str]] = None,
-    cr_filtered: Optional[List[Tuple[Tuple[float, float], str]]] = None,
-    cr: Optional[float] = None,
-) -> str:
-    extras = []
-    if extra_by_table and table in extra_by_table:
-        extras.extend(extra_by_table[table])
-    if global_extra:
-        extras.extend(global_extra)
-    if cr is not None and cr_filtered:
-        for (low, high), item in cr_filtered:
-            if low <= cr <= high:
-                extras.append(item)
-    table_data = _extend_table_with_custom(MAGIC_TABLES.get(table, []), extras)
-    if not table_data:
-        return "(no items configured)"
-    roll = random.randint(1, 100)
-    for threshold, item in table_data:
-        if roll <= threshold:
-            return item
-    return table_data[-1][1]
+        added.append((current, item))
+    # Both runs are sorted, and they only interleave when the base already reaches 100
+    if wrapped:
+        return list(heapq.merge(base, added, key=lambda x: x[0]))
+    return [*base, *added]
+
+
+@lru_cache(maxsize=256)
+def _custom_lut(table: str, extras: Tuple[str, ...]) -> Optional[D100Table]:
+    return _magic_lut(_extend_table_with_custom(MAGIC_TABLES.get(table, []), extras))
+
+
+class MagicContext:
+    """Custom magic items for one generate pass.
+
+    The effective sampler for each (table, CR) is resolved once and reused for every
+    roll in the pass instead of re-collecting the extras per item. CR-scoped items come in
+    as parallel ``cr_lo``/``cr_ranges``/``cr_items`` sequences already sorted by ``cr_lo``.
+    """
+
+    def __init__(
+        self,
+        extra_by_table: Optional[Dict[str, List[str]]] = None,
+        global_extra: Optional[List[str]] = None,
+        cr_lo: Sequence[float] = (),
+        cr_ranges: Sequence[Sequence[float]] = (),
+        cr_items: Sequence[str] = (),
+    ):
+        self.extra_by_table = extra_by_table or {}
+        self.global_extra = list(global_extra or [])
+        self._cr_lo = cr_lo
+        self._cr_ranges = cr_ranges
+        self._cr_items = cr_items
+        self._samplers: Dict[Tuple[str, Optional[float]], Optional[D100Table]] = {}
+
+    def sampler(self, table: str, cr: Optional[float] = None) -> Optional[D100Table]:
+        # CR only changes the extras when there are CR-scoped items
+        key = (table, cr if self._cr_lo else None)
+        if key in self._samplers:
+            return self._samplers[key]
+        extras = [*self.extra_by_table.get(table, []), *self.global_extra]
+        if cr is not None:
+            # Only bands starting at or below ``cr`` can contain it
+            ranges, items = self._cr_ranges, self._cr_items
+            for i in range(bisect_right(self._cr_lo, cr)):
+                if cr <= ranges[i][1]:
+                    extras.append(items[i])
+        sampler = _custom_lut(table, tuple(extras)) if extras else MAGIC_LUT.get(table)
+        self._samplers[key] = sampler
+        return sampler
+
+
+# Shared by callers that pass no custom items
+_NO_CUSTOM_MAGIC = MagicContext()
+
+
+def choose_magic(table: str, magic: Optional[MagicContext] = None, cr: Optional[float] = None) -> int:
+    """Pick one item from ``table`` plus any applicable extras; returns a MAGIC_ITEM_POOL id."""
+    sampler = (magic or _NO_CUSTOM_MAGIC).sampler(table, cr)
+    if sampler is None:
+        return NO_ITEMS_ID
+    return sampler.sample()
 
 
 def roll_magic(
     table: str,
     dice: str,
-    extra_by_table: Optional[Dict[str, List[str]]] = None,
-    global_extra: Optional[List[str]] = None,
-    cr_filtered: Optional[List[Tuple[Tuple[float, float], str]]] = None,
+    magic: Optional[MagicContext] = None,
     cr: Optional[float] = None,
+    num: Optional[int] = None,
 ) -> List[str]:
-    num = roll_expr(dice)
-    results = [choose_magic(table, extra_by_table, global_extra, cr_filtered, cr) for _ in range(num)]
-    return [_expand_spell_scroll(r) for r in results]
+    if num is None:
+        num = roll_expr(dice)
+    sampler = (magic or _NO_CUSTOM_MAGIC).sampler(table, cr)
+    if sampler is None:
+        return [MAGIC_ITEM_POOL[NO_ITEMS_ID]] * num
+    results: List[str] = []
+    for _ in range(num):
+        item_id = sampler.sample()
+        name = MAGIC_ITEM_POOL[item_id]
+        results.append(_expand_spell_scroll(name) if item_id in IS_SCROLL_IDX else name)
+    return results
+
+
+# Hoard bands by upper CR bound; anything above the last bound is "17+"
+_HOARD_KEYS = ("0-4", "5-10", "11-16", "17+")
+_HOARD_HIGHS = array("d", [4, 10, 16])
+
+
+def hoard_key_for_cr(cr: float) -> str:
+    idx = bisect_left(_HOARD_HIGHS, cr)
+    # A NaN CR fails every comparison and bisects to 0; send it to "17+" like _band_index does
+    if idx < len(_HOARD_HIGHS) and not cr <= _HOARD_HIGHS[idx]:
+        return _HOARD_KEYS[-1]
+    return _HOARD_KEYS[idx]
+
+
+# Rolled loot is a list of four string lists indexed by these slots, so callers rolling
+# many treasures can hand the same buffers back in through ``out``.
+COINS, GEMS, ART, MAGIC = 0, 1, 2, 3
+Loot = List[List[str]]
+# Output line prefix for each slot, in display order
+LOOT_LABELS = (("  Coins: ", COINS), ("  Gems: ", GEMS), ("  Art: ", ART), ("  Magic: ", MAGIC))
+
+
+def _reset_loot(out: Optional[Loot]) -> Loot:
+    if out is None:
+        return [[], [], [], []]
+    for part in out:
+        part.clear()
+    return out
 
 
 def roll_hoard(
     cr: float,
-    extra_by_table: Optional[Dict[str, List[str]]] = None,
-    global_extra: Optional[List[str]] = None,
-    cr_filtered: Optional[List[Tuple[Tuple[float, float], str]]] = None,
-) -> Dict[str, List[str]]:
-    key = None
-    if cr <= 4:
-        key = "0-4"
-    elif cr <= 10:
-        key = "5-10"
-    elif cr <= 16:
-        key = "11-16"
-    else:
-        key = "17+"
-
+    magic: Optional[MagicContext] = None,
+    coins: Optional[Coins] = None,
+    out: Optional[Loot] = None,
+) -> Loot:
+    """Roll one hoard; ``coins`` may be pre-rolled with ``coin_from_entry_batch``."""
+    key = hoard_key_for_cr(cr)
     table = HOARD_TABLES[key]
-    loot: Dict[str, List[str]] = {"coins": [], "gems": [], "art": [], "magic": []}
-    coins = coin_from_entry(table["coins"])
-    for coin, amt in coins.items():
-        loot["coins"].append(f"{amt} {coin}")
-
-    roll = random.randint(1, 100)
-    for threshold, reward in table["rows"]:
-        if roll <= threshold:
-            if reward.get("gems"):
-                dice, desc = GEM_PACKAGES[reward["gems"]]
-                loot["gems"].append(f"{roll_expr(dice)} x {desc}")
-            if reward.get("art"):
-                dice, desc = ART_PACKAGES[reward["art"]]
-                loot["art"].append(f"{roll_expr(dice)} x {desc}")
-            for table_letter, dice in reward.get("magic", []):
-                loot["magic"].extend(roll_magic(table_letter, dice, extra_by_table, global_extra, cr_filtered, cr))
-            break
+    loot = _reset_loot(out)
+    if coins is None:
+        coins = coin_from_entry(table["coins"])
+    for coin, amt in zip(COIN_DENOMS, coins):
+        if amt:
+            loot[COINS].append(f"{amt} {coin}")
+
+    gems, art, magic_rolls = HOARD_ROW_LUT[key].sample()
+    if gems:
+        num, die, mult, desc = gems
+        loot[GEMS].append(f"{roll_dice(num, die, mult)} x {desc}")
+    if art:
+        num, die, mult, desc = art
+        loot[ART].append(f"{roll_dice(num, die, mult)} x {desc}")
+    for table_letter, dice in magic_rolls:
+        loot[MAGIC].extend(roll_magic(table_letter, dice, magic, cr))
     return loot
 
 
@@ -518,39 +746,61 @@ INDIVIDUAL_MAGIC: List[Tuple[Tuple[float, float], Tuple[str, str]]] = [
     ((11, 16), ("C", "1d1")),
     ((17, math.inf), ("G", "1d2")),
 ]
+_INDIVIDUAL_MAGIC_BOUNDS = _cr_band_bounds(INDIVIDUAL_MAGIC)
+
+
+def _precompile_dice() -> None:
+    # Coin entries and hoard rows parse themselves; warm the cache for the remaining table dice.
+    for dice, _ in (*GEM_PACKAGES.values(), *ART_PACKAGES.values()):
+        compile_dice(dice)
+    for _, (_, dice) in INDIVIDUAL_MAGIC:
+        compile_dice(dice)
+
+
+_precompile_dice()
 
 
 def pick_individual_magic(cr: float) -> Tuple[str, str]:
-    for rng, info in INDIVIDUAL_MAGIC:
-        low, high = rng
-        if low <= cr <= high:
-            return info
-    return INDIVIDUAL_MAGIC[-1][1]
+    return INDIVIDUAL_MAGIC[_band_index(_INDIVIDUAL_MAGIC_BOUNDS, cr)][1]
 
 
 def roll_individual(
     cr: float,
     include_magic: bool = True,
-    extra_by_table: Optional[Dict[str, List[str]]] = None,
-    global_extra: Optional[List[str]] = None,
-    cr_filtered: Optional[List[Tuple[Tuple[float, float], str]]] = None,
-) -> Dict[str, List[str]]:
-    _, entries = pick_table_for_cr(cr)
-    coins = roll_table(entries)
-    loot: Dict[str, List[str]] = {"coins": [], "gems": [], "art": [], "magic": []}
-    for coin, amt in coins.items():
-        loot["coins"].append(f"{amt} {coin}")
+    magic: Optional[MagicContext] = None,
+    magic_count: Optional[int] = None,
+    out: Optional[Loot] = None,
+) -> Loot:
+    """Roll one individual treasure; ``magic_count`` may be pre-rolled with ``roll_expr_batch``."""
+    coins = roll_table(INDIVIDUAL_LUT[_individual_index(cr)])
+    loot = _reset_loot(out)
+    for coin, amt in zip(COIN_DENOMS, coins):
+        if amt:
+            loot[COINS].append(f"{amt} {coin}")
 
     if include_magic:
         table, dice = pick_individual_magic(cr)
-        loot["magic"].extend(roll_magic(table, dice, extra_by_table, global_extra, cr_filtered, cr))
+        loot[MAGIC].extend(roll_magic(table, dice, magic, cr, magic_count))
     return loot
 
 
 # ------------------------- GUI -------------------------
 
+# Custom-item file keys: single-letter magic tables, and sections that are not tables at all
+_VALID_TABLE_KEYS = frozenset("ABCDEFGHI")
+_RESERVED_KEYS = frozenset(("GLOBAL", "CR_SCOPED"))
+
+
+def _import_tk() -> None:
+    """Bind ``tk``/``ttk`` on first GUI use so importing the rollers never loads Tk."""
+    global tk, ttk
+    import tkinter as tk
+    from tkinter import ttk
+
+
 class EnemyRow:
     def __init__(self, parent: tk.Frame, row: int, on_remove):
+        _import_tk()
         self.parent = parent
         self.row_frame = tk.Frame(parent)
         self.row_frame.grid(row=row, column=0, sticky="ew", pady=2)
@@ -582,18 +832,33 @@ class EnemyRow:
 
 
 class LootApp:
+    # Scoped adds within this window share one auto-save
+    AUTOSAVE_DELAY_MS = 500
+    # Shared "Any" CR band; _parse_cr_band hands out this exact object so callers can test with `is`
+    _INF_RANGE: Tuple[int, float] = (0, math.inf)
+
     def __init__(self, root: tk.Tk):
+        _import_tk()
         self.root = root
         root.title("D&D 5e Loot Generator (SRD)")
         root.geometry("820x620")
+        root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self.rows: List[EnemyRow] = []
         self.individual_magic_var = tk.BooleanVar(value=True)
         self.custom_file_var = tk.StringVar(value="custom_items.json")
         self.custom_status_var = tk.StringVar(value="")
         self.custom_tables: Dict[str, List[str]] = {}
-        self.manual_items_by_table: Dict[str, List[str]] = {}
-        self.manual_items_by_cr: List[Tuple[Tuple[float, float], str]] = []
+        # Tables loaded from file stay tuples until add_scoped_item first appends to them
+        self.manual_items_by_table: Dict[str, Sequence[str]] = {}
+        # CR-scoped items as parallel lists kept sorted by lower CR bound; the [low, high]
+        # range lists are built once on add/load so saving serializes them as-is
+        self._cr_lo: List[float] = []
+        self._cr_ranges: List[List[float]] = []
+        self._cr_items: List[str] = []
+        self._save_after_id: Optional[str] = None
+        # Hash of the last (path, JSON text) written, to skip no-op saves
+        self._last_save_hash: Optional[int] = None
 
         top = tk.Frame(root)
         top.pack(fill="x", padx=8, pady=8)
@@ -611,6 +876,9 @@ class LootApp:
         manual_frame.pack(fill="x", padx=8, pady=(2, 4))
         self.manual_text = tk.Text(manual_frame, height=4)
         self.manual_text.pack(fill="x", padx=4, pady=4)
+        # Parsed lines of manual_text, dropped whenever the widget reports an edit
+        self._manual_items_cache: Optional[List[str]] = None
+        self.manual_text.bind("<<Modified>>", self._invalidate_manual_cache)
         # Tooltip/help line to clarify format
         ttk.Label(
             manual_frame,
@@ -679,27 +947,40 @@ class LootApp:
         try:
             buffer: List[str] = []
             extra_by_table = dict(self.custom_tables)
-            # Merge table-scoped manual items
+            # Merge table-scoped manual items (into new lists; custom_tables must not grow)
             for tbl, items in self.manual_items_by_table.items():
-                extra_by_table.setdefault(tbl, []).extend(items)
-            global_extra = self._manual_items()
-            cr_filtered = list(self.manual_items_by_cr)
+                extra_by_table[tbl] = [*extra_by_table.get(tbl, []), *items]
+            magic = MagicContext(extra_by_table, self._manual_items(), self._cr_lo, self._cr_ranges, self._cr_items)
+            include_magic = self.individual_magic_var.get()
+            loot: Loot = [[], [], [], []]
             for idx, row in enumerate(self.rows, start=1):
                 cr, count, hoard_flag = row.values()
                 buffer.append(f"Enemy group {idx}: CR {cr}, count {count}, {'Hoard' if hoard_flag else 'Individual'}")
-                for _ in range(count):
-                    loot = (
-                        roll_hoard(cr, extra_by_table, global_extra, cr_filtered)
-                        if hoard_flag
-                        else roll_individual(
+                # Pre-roll the dice shared by the whole group: hoard coins or individual magic counts
+                batch: Sequence[Any]
+                if hoard_flag:
+                    batch = coin_from_entry_batch(HOARD_TABLES[hoard_key_for_cr(cr)]["coins"], count)
+                elif include_magic:
+                    batch = roll_expr_batch(pick_individual_magic(cr)[1], count)
+                else:
+                    batch = [None] * count
+                for pre_rolled in batch:
+                    if hoard_flag:
+                        roll_hoard(cr, magic, coins=pre_rolled, out=loot)
+                    else:
+                        roll_individual(
                             cr,
-                            include_magic=self.individual_magic_var.get(),
-                            extra_by_table=extra_by_table,
-                            global_extra=global_extra,
-                            cr_filtered=cr_filtered,
+                            include_magic=include_magic,
+                            magic=magic,
+                            magic_count=pre_rolled,
+                            out=loot,
                         )
-                    )
-                    buffer.extend(self._format_loot(loot))
+                    start = len(buffer)
+                    for label, slot in LOOT_LABELS:
+                        if loot[slot]:
+                            buffer.append(label + ", ".join(loot[slot]))
+                    if len(buffer) == start:
+                        buffer.append("  No additional treasure")
                 buffer.append("")
             self.output.delete("1.0", tk.END)
             self.output.insert(tk.END, "\n".join(buffer).strip())
@@ -707,20 +988,6 @@ class LootApp:
             self.output.delete("1.0", tk.END)
             self.output.insert(tk.END, f"Error while generating loot: {exc}")
 
-    def _format_loot(self, loot: Dict[str, List[str]]) -> List[str]:
-        lines: List[str] = []
-        if loot["coins"]:
-            lines.append("  Coins: " + ", ".join(loot["coins"]))
-        if loot["gems"]:
-            lines.append("  Gems: " + ", ".join(loot["gems"]))
-        if loot["art"]:
-            lines.append("  Art: " + ", ".join(loot["art"]))
-        if loot["magic"]:
-            lines.append("  Magic: " + ", ".join(loot["magic"]))
-        if not lines:
-            lines.append("  No additional treasure")
-        return lines
-
     def copy_to_clipboard(self):
         text = self.output.get("1.0", tk.END)
         self.root.clipboard_clear()
@@ -730,8 +997,16 @@ class LootApp:
     # ------------------------- custom items helpers -------------------------
 
     def _manual_items(self) -> List[str]:
-        raw = self.manual_text.get("1.0", tk.END).splitlines()
-        return [line.strip() for line in raw if line.strip()]
+        """Global extras from the text box; the returned list is shared, do not mutate it."""
+        if self._manual_items_cache is None:
+            raw = self.manual_text.get("1.0", tk.END).splitlines()
+            self._manual_items_cache = [s for line in raw if (s := line.strip())]
+        return self._manual_items_cache
+
+    def _invalidate_manual_cache(self, _event=None):
+        self._manual_items_cache = None
+        # Re-arm the flag so the next edit fires <<Modified>> again
+        self.manual_text.edit_modified(False)
 
     def _parse_cr_band(self, text: str) -> Tuple[float, float]:
         text = text.strip()
@@ -743,7 +1018,7 @@ class LootApp:
             return 11, 16
         if text == "17+":
             return 17, math.inf
-        return (0, math.inf)
+        return self._INF_RANGE
 
     def load_custom_items_file(self, silent: bool = False):
         path = self.custom_file_var.get().strip()
@@ -756,48 +1031,76 @@ class LootApp:
                 data = json.load(fh)
             parsed_tables: Dict[str, List[str]] = {}
             global_extras: List[str] = []
-            cr_scoped: List[Tuple[Tuple[float, float], str]] = []
+            cr_scoped: List[Tuple[List[float], str]] = []
 
             if isinstance(data, dict):
                 for key, value in data.items():
                     up_key = str(key).upper()
                     if up_key == "GLOBAL" and isinstance(value, list):
-                        global_extras = [str(x).strip() for x in value if str(x).strip()]
-                    elif up_key == "CR_SCOPED" and isinstance(value, list):
-                        for entry in value:
-                            if isinstance(entry, dict) and "range" in entry and "item" in entry:
-                                rng = entry["range"]
-                                item = str(entry["item"]).strip()
-                                if isinstance(rng, (list, tuple)) and len(rng) == 2 and item:
-                                    try:
-                                        low = float(rng[0])
-                                        high = float(rng[1])
-                                        cr_scoped.append(((low, high), item))
-                                    except Exception:
-                                        continue
+                        global_extras = [s for x in value if (s := str(x).strip())]
+                    elif up_key == "CR_SCOPED" and isinstance(value, (list, dict)):
+                        if isinstance(value, dict):
+                            # Columnar form: {"ranges": [[low, high], ...], "items": [...]}
+                            ranges, raw_items = value.get("ranges"), value.get("items")
+                            if not (isinstance(ranges, list) and isinstance(raw_items, list)):
+                                ranges = raw_items = []
+                            pairs = zip(ranges, raw_items)
+                        else:
+                            # Older list of {"range": [low, high], "item": ...} objects
+                            pairs = (
+                                (entry["range"], entry["item"])
+                                for entry in value
+                                if isinstance(entry, dict) and "range" in entry and "item" in entry
+                            )
+                        for rng, raw_item in pairs:
+                            item = str(raw_item).strip()
+                            if isinstance(rng, (list, tuple)) and len(rng) == 2 and item:
+                                try:
+                                    low = float(rng[0])
+                                    high = float(rng[1])
+                                    cr_scoped.append(([low, high], item))
+                                except Exception:
+                                    continue
                     elif isinstance(value, list):
-                        items = [str(x).strip() for x in value if str(x).strip()]
+                        items = [s for x in value if (s := str(x).strip())]
                         if items:
                             parsed_tables[up_key] = items
             elif isinstance(data, list):
-                items = [str(x).strip() for x in data if str(x).strip()]
+                items = [s for x in data if (s := str(x).strip())]
                 if items:
                     parsed_tables["A"] = items
 
-            self.custom_tables = {k: v for k, v in parsed_tables.items() if k not in ("GLOBAL", "CR_SCOPED")}
-            self.manual_items_by_table = {k: list(v) for k, v in parsed_tables.items() if k in "ABCDEFGHI"}
-            self.manual_items_by_cr = cr_scoped
-            # Populate global text box
-            self.manual_text.delete("1.0", tk.END)
-            if global_extras:
-                self.manual_text.insert(tk.END, "\n".join(global_extras))
-
-            if not silent:
-                if parsed_tables or global_extras or cr_scoped:
-                    tables = ", ".join(sorted(parsed_tables.keys())) if parsed_tables else "none"
-                    self.custom_status_var.set(f"Loaded (tables: {tables})")
-                else:
-                    self.custom_status_var.set("File read, no items found")
+            # One pass; letter tables go to the manual dict only, so generate doesn't count them twice
+            custom_tables: Dict[str, List[str]] = {}
+            manual_tables: Dict[str, Sequence[str]] = {}
+            for k, v in parsed_tables.items():
+                if k in _VALID_TABLE_KEYS:
+                    manual_tables[k] = tuple(v)
+                elif k not in _RESERVED_KEYS:
+                    custom_tables[k] = v
+            self.custom_tables, self.manual_items_by_table = custom_tables, manual_tables
+            cr_scoped.sort(key=lambda entry: entry[0][0])
+            self._cr_lo = [rng[0] for rng, _ in cr_scoped]
+            self._cr_ranges = [rng for rng, _ in cr_scoped]
+            self._cr_items = [item for _, item in cr_scoped]
+            # Populate global text box in one Tcl call
+            text = "\n".join(global_extras)
+            try:
+                self.manual_text.replace("1.0", tk.END, text)
+            except tk.TclError:  # Tk before 8.6 has no "replace" text command
+                self.manual_text.delete("1.0", tk.END)
+                self.manual_text.insert(tk.END, text)
+            self._invalidate_manual_cache()
+
+            # Status text only; silent (startup) loads never show it
+            if silent:
+                return
+            if parsed_tables:
+                self.custom_status_var.set(f"Loaded (tables: {', '.join(sorted(parsed_tables))})")
+            elif global_extras or cr_scoped:
+                self.custom_status_var.set("Loaded (tables: none)")
+            else:
+                self.custom_status_var.set("File read, no items found")
         except Exception as exc:  # pragma: no cover - GUI feedback
             if not silent:
                 self.custom_status_var.set(f"Error: {exc}")
@@ -811,37 +1114,85 @@ class LootApp:
             return
         cr_range = self._parse_cr_band(band)
         if table == "ALL":
-            self.manual_items_by_cr.append((cr_range, item))
+            self._add_cr_item(cr_range, item)
         else:
-            self.manual_items_by_table.setdefault(table, []).append(item)
-            if cr_range != (0, math.inf):
-                # Keep a CR filter for table-scoped too by encoding in manual_items_by_cr
-                self.manual_items_by_cr.append((cr_range, item))
+            items = self.manual_items_by_table.get(table)
+            if isinstance(items, list):
+                items.append(item)
+            else:
+                self.manual_items_by_table[table] = [*(items or ()), item]
+            if cr_range is not self._INF_RANGE:
+                # Keep a CR filter for table-scoped too by encoding it as a CR-scoped item
+                self._add_cr_item(cr_range, item)
         self.scoped_item_var.set("")
         self.scoped_status.set("Added")
         # Auto-save to persist between runs
+        self._schedule_autosave()
+
+    def _add_cr_item(self, cr_range: Tuple[float, float], item: str):
+        low, high = cr_range
+        idx = bisect_right(self._cr_lo, low)
+        self._cr_lo.insert(idx, low)
+        self._cr_ranges.insert(idx, [low, high])
+        self._cr_items.insert(idx, item)
+
+    def _schedule_autosave(self):
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(self.AUTOSAVE_DELAY_MS, self._run_autosave)
+
+    def _run_autosave(self):
+        self._save_after_id = None
         self.save_custom_items_file(auto=True)
 
+    def _on_close(self):
+        # Flush a pending auto-save so items added just before closing are kept
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+            self._run_autosave()
+        self.root.destroy()
+
     def save_custom_items_file(self, auto: bool = False):
         path = self.custom_file_var.get().strip() or "custom_items.json"
-        payload: Dict[str, List[str]] = {}
-        # Table-scoped items from file + manual additions
-        for tbl, items in self.manual_items_by_table.items():
-            payload.setdefault(tbl, []).extend(items)
-        for tbl, items in self.custom_tables.items():
-            payload.setdefault(tbl, []).extend(items)
+        # Table-scoped items from file + manual additions. Loading keeps the two dicts' keys
+        # disjoint, so one merge sizes the payload up front; values are then replaced in place
+        # (no resize). dict.fromkeys drops repeated items while keeping first-seen order.
+        payload: Dict[str, Any] = {**self.manual_items_by_table, **self.custom_tables}
+        for tbl, items in payload.items():
+            payload[tbl] = list(dict.fromkeys(items))
         # Global extras
         global_extras = self._manual_items()
         if global_extras:
-            payload.setdefault("GLOBAL", []).extend(global_extras)
+            payload["GLOBAL"] = list(dict.fromkeys(global_extras))
         # CR-scoped items
-        if self.manual_items_by_cr:
-            payload["CR_SCOPED"] = [
-                {"range": list(rng), "item": item} for rng, item in self.manual_items_by_cr
-            ]
+        if self._cr_items:
+            # Columnar: one ranges list and one items list instead of an object per entry
+            payload["CR_SCOPED"] = {
+                "ranges": self._cr_ranges,
+                "items": self._cr_items,
+            }
         try:
-            with open(path, "w", encoding="utf-8") as fh:
-                json.dump(payload, fh, indent=2)
+            # Auto-saves are written compact; explicit saves stay human-readable
+            if auto:
+                text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+            else:
+                text = json.dumps(payload, indent=2, ensure_ascii=False)
+            # Encode once and write raw bytes rather than going through a text-mode file
+            data = text.encode("utf-8")
+            digest = hash((path, data))
+            # Only auto-saves skip unchanged content; the Save button always rewrites the file
+            if not auto or digest != self._last_save_hash or not os.path.exists(path):
+                # Write a sibling temp file and swap it in so a crash never leaves a torn file
+                tmp_path = path + ".tmp"
+                try:
+                    with open(tmp_path, "wb") as fh:
+                        fh.write(data)
+                    os.replace(tmp_path, path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                self._last_save_hash = digest
             if not auto:
                 self.save_status.set(f"Saved to {path}")
         except Exception as exc:  # pragma: no cover - GUI feedback
@@ -850,6 +1201,7 @@ class LootApp:
 
 
 def main():
+    _import_tk()
     root = tk.Tk()
     LootApp(root)
     root.mainloop()